@@ -1,8 +1,132 @@
-from flask import Flask, jsonify, request, send_from_directory
+from flask import Flask, Response, abort, g, has_request_context, request, send_from_directory
 from flask_cors import CORS
+from collections import Counter
+import msgspec
 import os
 import socket
-from models import db, MealTask
+import sqlalchemy as sa
+from models import db, MealTask, Ingredient
+from schemas import TaskCreate, TaskUpdate
+
+# Sample data seeded into an empty database on first start
+SAMPLE_TASKS = [
+    dict(
+        name="Roast Turkey",
+        description="24-pound turkey with herb butter",
+        category="main",
+        status="planned",
+        priority=1,
+        start_time="11:00 AM",
+        duration_minutes=240,
+        assigned_to="Chef",
+        ingredients=["turkey", "butter", "herbs", "salt", "pepper", "garlic"]
+    ),
+    dict(
+        name="Mashed Potatoes",
+        description="Creamy mashed potatoes with butter and cream",
+        category="side",
+        status="planned",
+        priority=2,
+        start_time="2:00 PM",
+        duration_minutes=45,
+        assigned_to="Sous Chef",
+        ingredients=["potatoes", "butter", "cream", "salt", "garlic"]
+    ),
+    dict(
+        name="Green Bean Casserole",
+        description="Classic green bean casserole with crispy onions",
+        category="side",
+        status="planned",
+        priority=3,
+        start_time="2:30 PM",
+        duration_minutes=60,
+        assigned_to="Helper 1",
+        ingredients=["green beans", "mushroom soup", "milk", "crispy onions"]
+    ),
+    dict(
+        name="Cranberry Sauce",
+        description="Homemade cranberry sauce with orange zest",
+        category="side",
+        status="in_progress",
+        priority=4,
+        start_time="1:00 PM",
+        duration_minutes=30,
+        assigned_to="Helper 2",
+        ingredients=["cranberries", "sugar", "orange", "water"]
+    ),
+    dict(
+        name="Pumpkin Pie",
+        description="Traditional pumpkin pie with whipped cream",
+        category="dessert",
+        status="completed",
+        priority=5,
+        start_time="9:00 AM",
+        duration_minutes=90,
+        assigned_to="Baker",
+        ingredients=["pumpkin", "eggs", "cream", "sugar", "cinnamon", "pie crust"]
+    ),
+    dict(
+        name="Stuffing",
+        description="Savory bread stuffing with herbs",
+        category="side",
+        status="planned",
+        priority=2,
+        start_time="1:30 PM",
+        duration_minutes=60,
+        assigned_to="Chef",
+        ingredients=["bread", "celery", "onion", "butter", "herbs", "chicken broth"]
+    ),
+    dict(
+        name="Gravy",
+        description="Turkey gravy from pan drippings",
+        category="side",
+        status="planned",
+        priority=1,
+        start_time="3:15 PM",
+        duration_minutes=15,
+        assigned_to="Chef",
+        ingredients=["turkey drippings", "flour", "chicken broth", "salt", "pepper"]
+    ),
+    dict(
+        name="Dinner Rolls",
+        description="Soft and buttery dinner rolls",
+        category="side",
+        status="in_progress",
+        priority=3,
+        start_time="2:00 PM",
+        duration_minutes=120,
+        assigned_to="Baker",
+        ingredients=["flour", "yeast", "milk", "butter", "sugar", "salt", "eggs"]
+    ),
+    dict(
+        name="Caesar Salad",
+        description="Fresh Caesar salad with homemade dressing",
+        category="appetizer",
+        status="planned",
+        priority=4,
+        start_time="3:00 PM",
+        duration_minutes=20,
+        assigned_to="Helper 1",
+        ingredients=["romaine lettuce", "parmesan", "croutons", "caesar dressing", "lemon"]
+    ),
+    dict(
+        name="Pecan Pie",
+        description="Sweet pecan pie with vanilla ice cream",
+        category="dessert",
+        status="completed",
+        priority=5,
+        start_time="9:30 AM",
+        duration_minutes=75,
+        assigned_to="Baker",
+        ingredients=["pecans", "corn syrup", "eggs", "butter", "sugar", "vanilla", "pie crust"]
+    )
+]
+
+# Task columns a PUT request may change directly; ingredients live in
+# their own table and are replaced separately
+UPDATABLE_FIELDS = tuple(
+    field for field in TaskUpdate.__struct_fields__ if field != 'ingredients'
+)
 
 app = Flask(__name__, static_folder='static', static_url_path='')
 CORS(app)
@@ -10,214 +134,252 @@ CORS(app)
 # Database configuration
 app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///thanksgiving.db'
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {
+    'pool_size': 10,
+    'max_overflow': 20,
+    'pool_pre_ping': True,
+    # Connections are shared across gunicorn threads; timeout is how long
+    # SQLite waits on a locked database before raising
+    'connect_args': {'check_same_thread': False, 'timeout': 30},
+}
 
 # Initialize database
 db.init_app(app)
 
-# Create tables and sample data
+# SQLite tuning: WAL lets readers run alongside a writer, and
+# synchronous=NORMAL needs a single fsync per commit in WAL mode
+SQLITE_PRAGMAS = """
+PRAGMA journal_mode=WAL;
+PRAGMA synchronous=NORMAL;
+PRAGMA temp_store=MEMORY;
+PRAGMA mmap_size=268435456;
+PRAGMA cache_size=-64000;
+"""
+
+with app.app_context():
+    @sa.event.listens_for(db.engine, 'connect')
+    def set_sqlite_pragmas(dbapi_conn, connection_record):
+        """Apply SQLITE_PRAGMAS to every new DBAPI connection"""
+        cursor = dbapi_conn.cursor()
+        cursor.executescript(SQLITE_PRAGMAS)
+        cursor.close()
+
+# Core table objects used for startup work and the hot request paths
+tasks_table = MealTask.__table__
+ingredients_table = Ingredient.__table__
+
+# Create tables and sample data in a single transaction
 with app.app_context():
-    db.create_all()
-
-    # Add sample data if database is empty
-    if MealTask.query.count() == 0:
-        sample_tasks = [
-            MealTask(
-                name="Roast Turkey",
-                description="24-pound turkey with herb butter",
-                category="main",
-                status="planned",
-                priority=1,
-                start_time="11:00 AM",
-                duration_minutes=240,
-                assigned_to="Chef",
-                ingredients="turkey,butter,herbs,salt,pepper,garlic"
-            ),
-            MealTask(
-                name="Mashed Potatoes",
-                description="Creamy mashed potatoes with butter and cream",
-                category="side",
-                status="planned",
-                priority=2,
-                start_time="2:00 PM",
-                duration_minutes=45,
-                assigned_to="Sous Chef",
-                ingredients="potatoes,butter,cream,salt,garlic"
-            ),
-            MealTask(
-                name="Green Bean Casserole",
-                description="Classic green bean casserole with crispy onions",
-                category="side",
-                status="planned",
-                priority=3,
-                start_time="2:30 PM",
-                duration_minutes=60,
-                assigned_to="Helper 1",
-                ingredients="green beans,mushroom soup,milk,crispy onions"
-            ),
-            MealTask(
-                name="Cranberry Sauce",
-                description="Homemade cranberry sauce with orange zest",
-                category="side",
-                status="in_progress",
-                priority=4,
-                start_time="1:00 PM",
-                duration_minutes=30,
-                assigned_to="Helper 2",
-                ingredients="cranberries,sugar,orange,water"
-            ),
-            MealTask(
-                name="Pumpkin Pie",
-                description="Traditional pumpkin pie with whipped cream",
-                category="dessert",
-                status="completed",
-                priority=5,
-                start_time="9:00 AM",
-                duration_minutes=90,
-                assigned_to="Baker",
-                ingredients="pumpkin,eggs,cream,sugar,cinnamon,pie crust"
-            ),
-            MealTask(
-                name="Stuffing",
-                description="Savory bread stuffing with herbs",
-                category="side",
-                status="planned",
-                priority=2,
-                start_time="1:30 PM",
-                duration_minutes=60,
-                assigned_to="Chef",
-                ingredients="bread,celery,onion,butter,herbs,chicken broth"
-            ),
-            MealTask(
-                name="Gravy",
-                description="Turkey gravy from pan drippings",
-                category="side",
-                status="planned",
-                priority=1,
-                start_time="3:15 PM",
-                duration_minutes=15,
-                assigned_to="Chef",
-                ingredients="turkey drippings,flour,chicken broth,salt,pepper"
-            ),
-            MealTask(
-                name="Dinner Rolls",
-                description="Soft and buttery dinner rolls",
-                category="side",
-                status="in_progress",
-                priority=3,
-                start_time="2:00 PM",
-                duration_minutes=120,
-                assigned_to="Baker",
-                ingredients="flour,yeast,milk,butter,sugar,salt,eggs"
-            ),
-            MealTask(
-                name="Caesar Salad",
-                description="Fresh Caesar salad with homemade dressing",
-                category="appetizer",
-                status="planned",
-                priority=4,
-                start_time="3:00 PM",
-                duration_minutes=20,
-                assigned_to="Helper 1",
-                ingredients="romaine lettuce,parmesan,croutons,caesar dressing,lemon"
-            ),
-            MealTask(
-                name="Pecan Pie",
-                description="Sweet pecan pie with vanilla ice cream",
-                category="dessert",
-                status="completed",
-                priority=5,
-                start_time="9:30 AM",
-                duration_minutes=75,
-                assigned_to="Baker",
-                ingredients="pecans,corn syrup,eggs,butter,sugar,vanilla,pie crust"
-            )
-        ]
-        db.session.add_all(sample_tasks)
-        db.session.commit()
+    with db.engine.begin() as conn:
+        # pysqlite only opens a transaction before DML, so take the write
+        # lock explicitly; this makes the schema work, the emptiness check
+        # and the seed insert atomic across concurrently starting workers
+        conn.execute(sa.text('BEGIN IMMEDIATE'))
+        db.metadata.create_all(conn)
+
+        # Indexes added after a database was first created
+        for index in tasks_table.indexes:
+            index.create(conn, checkfirst=True)
+
+        # Databases created before the ingredients table kept ingredients as
+        # a comma-separated meal_tasks.ingredients column; copy any values
+        # still there into the table and clear them so this runs once
+        legacy_columns = {column['name'] for column in sa.inspect(conn).get_columns('meal_tasks')}
+        if 'ingredients' in legacy_columns:
+            legacy_rows = conn.execute(sa.text(
+                "SELECT id, ingredients FROM meal_tasks "
+                "WHERE ingredients <> '' "
+                "AND id NOT IN (SELECT task_id FROM ingredients)"
+            )).all()
+            if legacy_rows:
+                conn.execute(ingredients_table.insert(), [
+                    {'task_id': task_id, 'name': name}
+                    for task_id, csv in legacy_rows
+                    for name in csv.split(',')
+                ])
+            conn.execute(sa.text('UPDATE meal_tasks SET ingredients = NULL WHERE ingredients IS NOT NULL'))
+
+        # Add sample data if database is empty
+        if conn.execute(sa.text('SELECT 1 FROM meal_tasks LIMIT 1')).first() is None:
+            task_ids = conn.execute(
+                tasks_table.insert().returning(
+                    tasks_table.c.id, sort_by_parameter_order=True
+                ),
+                [{k: v for k, v in task.items() if k != 'ingredients'} for task in SAMPLE_TASKS]
+            ).scalars().all()
+            conn.execute(ingredients_table.insert(), [
+                {'task_id': task_id, 'name': name}
+                for task_id, task in zip(task_ids, SAMPLE_TASKS)
+                for name in task['ingredients']
+            ])
+
+# Development guard against N+1 queries: warn when a request runs the same
+# SQL statement more than once, which is how a lazy load inside a loop shows up.
+# NPLUSONE_RAISE=1 (or app.config['NPLUSONE_RAISE']) raises instead, so tests
+# fail on regressions
+app.config['NPLUSONE_RAISE'] = os.getenv('NPLUSONE_RAISE') == '1'
+
+if app.debug:
+    @app.before_request
+    def reset_statement_counts():
+        g.statement_counts = Counter()
+
+    with app.app_context():
+        @sa.event.listens_for(db.engine, 'before_cursor_execute')
+        def count_statement(conn, cursor, statement, parameters, context, executemany):
+            if has_request_context() and 'statement_counts' in g:
+                g.statement_counts[statement] += 1
+
+    @app.after_request
+    def warn_repeated_statements(response):
+        for statement, count in g.get('statement_counts', Counter()).items():
+            if count > 1:
+                message = 'Possible N+1 query in %s: statement ran %d times: %s' % (
+                    request.path, count, statement
+                )
+                if app.config['NPLUSONE_RAISE']:
+                    raise RuntimeError(message)
+                app.logger.warning(message)
+        return response
+
+def json_response(payload, status=200):
+    """Encode payload with msgspec into a JSON response"""
+    return Response(msgspec.json.encode(payload), status=status, mimetype='application/json')
+
+@app.errorhandler(msgspec.DecodeError)
+def invalid_request_body(error):
+    """Reject malformed or invalid JSON request bodies"""
+    return json_response({'error': str(error)}, status=400)
 
 @app.route('/')
 def index():
     """Serve the main frontend"""
-    return send_from_directory(app.static_folder, 'index.html')
+    # Short browser cache; the ETag from send_from_directory makes the
+    # revalidation after expiry a cheap 304
+    response = send_from_directory(app.static_folder, 'index.html', max_age=60)
+    response.cache_control.must_revalidate = True
+    return response
+
+# Static payloads, encoded once at startup
+INFO_JSON = msgspec.json.encode({
+    'message': 'Thanksgiving Meal Planner API',
+    'hostname': socket.gethostname(),
+    'environment': os.getenv('ENVIRONMENT', 'development'),
+    'version': '1.0.0'
+})
+HEALTH_JSON = msgspec.json.encode({'status': 'healthy'})
 
 @app.route('/api/info')
 def info():
     """API info endpoint"""
-    return jsonify({
-        'message': 'Thanksgiving Meal Planner API',
-        'hostname': socket.gethostname(),
-        'environment': os.getenv('ENVIRONMENT', 'development'),
-        'version': '1.0.0'
-    })
+    return Response(INFO_JSON, mimetype='application/json')
 
 @app.route('/health')
 def health():
-    return jsonify({'status': 'healthy'}), 200
+    return Response(HEALTH_JSON, status=200, mimetype='application/json')
+
+# Core statements for the hot endpoints, built once so each request
+# only looks up the already compiled SQL in SQLAlchemy's statement cache
+ALL_TASKS_STMT = sa.select(*tasks_table.c).order_by(tasks_table.c.priority)
+ALL_INGREDIENTS_STMT = sa.select(
+    ingredients_table.c.task_id, ingredients_table.c.name
+).order_by(ingredients_table.c.id)
+TASK_STMT = sa.select(*tasks_table.c).where(tasks_table.c.id == sa.bindparam('task_id'))
+TASK_INGREDIENTS_STMT = sa.select(ingredients_table.c.name).where(
+    ingredients_table.c.task_id == sa.bindparam('task_id')
+).order_by(ingredients_table.c.id)
+STATS_STMT = sa.select(
+    tasks_table.c.status,
+    sa.func.count(),
+    sa.func.coalesce(sa.func.sum(tasks_table.c.duration_minutes), 0)
+).group_by(tasks_table.c.status)
 
 # Task endpoints
 @app.route('/api/tasks', methods=['GET'])
 def get_tasks():
     """Get all meal tasks"""
-    tasks = MealTask.query.order_by(MealTask.priority).all()
-    return jsonify([task.to_dict() for task in tasks])
+    conn = db.session.connection()
+    rows = conn.execute(ALL_TASKS_STMT).mappings().all()
+
+    ingredients = {}
+    for task_id, name in conn.execute(ALL_INGREDIENTS_STMT):
+        ingredients.setdefault(task_id, []).append(name)
+
+    payload = [dict(row, ingredients=ingredients.get(row['id'], [])) for row in rows]
+    return json_response(payload)
 
 @app.route('/api/tasks/<int:task_id>', methods=['GET'])
 def get_task(task_id):
     """Get a specific task"""
-    task = MealTask.query.get_or_404(task_id)
-    return jsonify(task.to_dict())
+    task = db.get_or_404(MealTask, task_id)
+    return json_response(task.to_dict())
 
 @app.route('/api/tasks', methods=['POST'])
 def create_task():
     """Create a new task"""
-    data = request.json
-    task = MealTask(
-        name=data.get('name'),
-        description=data.get('description'),
-        category=data.get('category'),
-        status=data.get('status', 'planned'),
-        priority=data.get('priority', 1),
-        start_time=data.get('start_time'),
-        duration_minutes=data.get('duration_minutes'),
-        assigned_to=data.get('assigned_to'),
-        ingredients=','.join(data.get('ingredients', []))
-    )
-    db.session.add(task)
+    task = msgspec.json.decode(request.get_data(), type=TaskCreate)
+    values = msgspec.structs.asdict(task)
+    ingredients = values.pop('ingredients')
+
+    # RETURNING hands back generated values such as id and created_at,
+    # so no follow-up SELECT is needed to build the response
+    conn = db.session.connection()
+    row = conn.execute(
+        tasks_table.insert().values(values).returning(*tasks_table.c)
+    ).mappings().one()
+    if ingredients:
+        conn.execute(ingredients_table.insert(), [
+            {'task_id': row['id'], 'name': name} for name in ingredients
+        ])
     db.session.commit()
-    return jsonify(task.to_dict()), 201
+
+    payload = dict(row, ingredients=ingredients)
+    return json_response(payload, status=201)
 
 @app.route('/api/tasks/<int:task_id>', methods=['PUT'])
 def update_task(task_id):
     """Update a task"""
-    task = MealTask.query.get_or_404(task_id)
-    data = request.json
-
-    if 'name' in data:
-        task.name = data['name']
-    if 'description' in data:
-        task.description = data['description']
-    if 'category' in data:
-        task.category = data['category']
-    if 'status' in data:
-        task.status = data['status']
-    if 'priority' in data:
-        task.priority = data['priority']
-    if 'start_time' in data:
-        task.start_time = data['start_time']
-    if 'duration_minutes' in data:
-        task.duration_minutes = data['duration_minutes']
-    if 'assigned_to' in data:
-        task.assigned_to = data['assigned_to']
-    if 'ingredients' in data:
-        task.ingredients = ','.join(data['ingredients'])
+    changes = msgspec.json.decode(request.get_data(), type=TaskUpdate)
+
+    values = {
+        field: getattr(changes, field)
+        for field in UPDATABLE_FIELDS
+        if getattr(changes, field) is not msgspec.UNSET
+    }
 
+    # Resolve the task before touching ingredients: the UPDATE hands the
+    # row back via RETURNING, otherwise a plain PK lookup does
+    conn = db.session.connection()
+    if values:
+        row = conn.execute(
+            tasks_table.update()
+            .where(tasks_table.c.id == task_id)
+            .values(values)
+            .returning(*tasks_table.c)
+        ).mappings().first()
+    else:
+        row = conn.execute(TASK_STMT, {'task_id': task_id}).mappings().first()
+    if row is None:
+        abort(404)
+
+    if changes.ingredients is msgspec.UNSET:
+        ingredients = conn.execute(TASK_INGREDIENTS_STMT, {'task_id': task_id}).scalars().all()
+    else:
+        ingredients = changes.ingredients
+        conn.execute(ingredients_table.delete().where(ingredients_table.c.task_id == task_id))
+        if ingredients:
+            conn.execute(ingredients_table.insert(), [
+                {'task_id': task_id, 'name': name} for name in ingredients
+            ])
     db.session.commit()
-    return jsonify(task.to_dict())
+
+    payload = dict(row, ingredients=ingredients)
+    return json_response(payload)
 
 @app.route('/api/tasks/<int:task_id>', methods=['DELETE'])
 def delete_task(task_id):
     """Delete a task"""
-    task = MealTask.query.get_or_404(task_id)
+    task = db.get_or_404(MealTask, task_id)
     db.session.delete(task)
     db.session.commit()
     return '', 204
@@ -225,16 +387,18 @@ def delete_task(task_id):
 @app.route('/api/stats', methods=['GET'])
 def get_stats():
     """Get statistics about the meal planning"""
-    total_tasks = MealTask.query.count()
-    completed = MealTask.query.filter_by(status='completed').count()
-    in_progress = MealTask.query.filter_by(status='in_progress').count()
-    planned = MealTask.query.filter_by(status='planned').count()
+    rows = db.session.connection().execute(STATS_STMT).all()
+
+    counts = {status: count for status, count, _ in rows}
+    total_tasks = sum(counts.values())
+    completed = counts.get('completed', 0)
+    in_progress = counts.get('in_progress', 0)
+    planned = counts.get('planned', 0)
 
     # Calculate total cooking time
-    tasks = MealTask.query.all()
-    total_minutes = sum(task.duration_minutes for task in tasks if task.duration_minutes)
+    total_minutes = sum(minutes for _, _, minutes in rows)
 
-    return jsonify({
+    return json_response({
         'total_tasks': total_tasks,
         'completed': completed,
         'in_progress': in_progress,
@@ -245,4 +409,5 @@ def get_stats():
 
 if __name__ == '__main__':
     port = int(os.getenv('PORT', 5000))
-    app.run(host='0.0.0.0', port=port, debug=True)
+    # Development server only; set FLASK_DEBUG=1 for the debugger and reloader
+    app.run(host='0.0.0.0', port=port)
@@ -0,0 +1,22 @@
+"""Gunicorn settings for running the app in the container"""
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '5000')}"
+
+# Worker processes; override with WEB_CONCURRENCY to match the task's CPU
+# and memory limits. os.cpu_count() is not used because inside a container
+# it reports the host's CPUs rather than the cgroup quota
+workers = int(os.getenv('WEB_CONCURRENCY', 2))
+worker_class = 'gthread'
+threads = int(os.getenv('GUNICORN_THREADS', 4))
+keepalive = 5
+
+# Load the app once in the master so table creation and seeding run once
+preload_app = True
+
+
+def post_fork(server, worker):
+    """Drop database connections inherited from the master process"""
+    from app import app, db
+    with app.app_context():
+        db.engine.dispose(close=False)
@@ -1,36 +1,52 @@
 from flask_sqlalchemy import SQLAlchemy
 from datetime import datetime
+from operator import attrgetter
 
 db = SQLAlchemy()
 
+# Columns that to_dict copies as-is, fetched in one attrgetter call
+_PLAIN_KEYS = (
+    'id', 'name', 'description', 'category', 'status', 'priority',
+    'start_time', 'duration_minutes', 'assigned_to'
+)
+_get_plain_values = attrgetter(*_PLAIN_KEYS)
+
 class MealTask(db.Model):
     """Model for Thanksgiving meal planning tasks"""
     __tablename__ = 'meal_tasks'
+    __table_args__ = (
+        db.Index('ix_meal_status_priority', 'status', 'priority'),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
     category = db.Column(db.String(50))  # appetizer, main, side, dessert, prep
     status = db.Column(db.String(20), default='planned')  # planned, in_progress, completed
-    priority = db.Column(db.Integer, default=1)
+    priority = db.Column(db.Integer, default=1, index=True)
     start_time = db.Column(db.String(10))  # e.g., "10:00 AM"
     duration_minutes = db.Column(db.Integer)
     assigned_to = db.Column(db.String(50))
-    ingredients = db.Column(db.Text)  # Comma-separated list
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    ingredients = db.relationship(
+        'Ingredient',
+        lazy='selectin',
+        cascade='all, delete-orphan',
+        order_by='Ingredient.id'
+    )
 
     def to_dict(self):
         """Convert model to dictionary"""
-        return {
-            'id': self.id,
-            'name': self.name,
-            'description': self.description,
-            'category': self.category,
-            'status': self.status,
-            'priority': self.priority,
-            'start_time': self.start_time,
-            'duration_minutes': self.duration_minutes,
-            'assigned_to': self.assigned_to,
-            'ingredients': self.ingredients.split(',') if self.ingredients else [],
-            'created_at': self.created_at.isoformat() if self.created_at else None
-        }
+        data = dict(zip(_PLAIN_KEYS, _get_plain_values(self)))
+        data['ingredients'] = [ingredient.name for ingredient in self.ingredients]
+        data['created_at'] = self.created_at.isoformat() if self.created_at else None
+        return data
+
+
+class Ingredient(db.Model):
+    """Model for an ingredient used by a meal task"""
+    __tablename__ = 'ingredients'
+
+    id = db.Column(db.Integer, primary_key=True)
+    task_id = db.Column(db.Integer, db.ForeignKey('meal_tasks.id'), nullable=False, index=True)
+    name = db.Column(db.String(100), nullable=False)
@@ -0,0 +1,28 @@
+import msgspec
+from msgspec import UNSET, UnsetType
+
+
+class TaskCreate(msgspec.Struct, kw_only=True):
+    """Request body for creating a meal task"""
+    name: str
+    description: str | None = None
+    category: str | None = None
+    status: str = 'planned'
+    priority: int = 1
+    start_time: str | None = None
+    duration_minutes: int | None = None
+    assigned_to: str | None = None
+    ingredients: list[str] = []
+
+
+class TaskUpdate(msgspec.Struct, kw_only=True):
+    """Request body for updating a meal task; omitted fields stay UNSET"""
+    name: str | UnsetType = UNSET
+    description: str | None | UnsetType = UNSET
+    category: str | None | UnsetType = UNSET
+    status: str | UnsetType = UNSET
+    priority: int | UnsetType = UNSET
+    start_time: str | None | UnsetType = UNSET
+    duration_minutes: int | None | UnsetType = UNSET
+    assigned_to: str | None | UnsetType = UNSET
+    ingredients: list[str] | UnsetType = UNSET